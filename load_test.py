@@ -0,0 +1,369 @@
+import argparse
+import json
+import multiprocessing
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from modules.diffie_hellman import getLargePrimeNumber, getPrimitiveRoot, keyGeneration, sharedKeyGeneration
+from modules.key_pool import getKeyPool
+from modules.compression import acceptCompression, proposeCompression, compressionMethods
+from modules.encrypted_stream import EncryptedStream
+from modules.line_protocol import recvLine, sendLine
+from receiver import keyGenerationForDES
+
+'''
+Teste de carga local para o protocolo do sender.py/receiver.py
+
+Lógica do teste:
+1. Um receptor é iniciado em loopback (uma thread por conexão, como um servidor real em Python).
+2. N emissores simulados, cada um em um processo próprio, abrem sessões com o receptor.
+3. Cada sessão executa o mesmo protocolo dos scripts: Diffie-Hellman, derivação da chave do DES,
+   negociação da compressão e troca de mensagens pelo EncryptedStream.
+4. O receptor confirma cada mensagem com um byte criptografado, permitindo medir a latência de ida e volta.
+5. As fases de handshakes e de mensagens são sincronizadas entre os emissores por uma barreira
+   e medidas separadamente, já com os processos iniciados.
+6. Ao final são exibidos handshakes/s, mensagens/s, percentis de latência e tempo de CPU por
+   handshake e por mensagem.
+
+Diferente dos scripts, os valores do handshake são separados por quebras de linha em vez de pausas
+(time.sleep), para que o custo medido seja apenas o do processamento.
+'''
+
+
+def _desKey(p, q, shared):
+    '''
+    Converte a chave compartilhada em chave do DES exatamente como os scripts.
+    '''
+    return keyGenerationForDES(p, q, int(str(shared), 16))
+
+
+def _handleSession(client_sock, p, q, keyPool, options, stats):
+    '''
+    Lado do receptor de uma sessão: handshake, negociação e confirmação de cada mensagem recebida.
+    O tempo de CPU da thread em cada fase é somado em "stats".
+    '''
+    with client_sock:
+        cpuStart = time.thread_time()
+        sendLine(client_sock, p)
+        sendLine(client_sock, q)
+        if keyPool is not None:
+            privateServer, publicServer = keyPool.acquire()
+        else:
+            privateServer, publicServer = keyGeneration(p, q)
+        sendLine(client_sock, publicServer)
+        publicClient = int(recvLine(client_sock))
+        DES_key = _desKey(p, q, sharedKeyGeneration(publicClient, privateServer, p))
+        compression = acceptCompression(client_sock, compressionMethods)
+        stream = EncryptedStream(client_sock, DES_key, chunkSize=options["chunkSize"],
+                                 compression=compression,
+                                 compressionThreshold=options["compressionThreshold"])
+        handshakeCpu = time.thread_time() - cpuStart
+
+        cpuStart = time.thread_time()
+        for _ in stream.makefile("rb"):
+            stream.sendall(b"\n")  # Confirmação da mensagem
+        messageCpu = time.thread_time() - cpuStart
+
+    with stats["lock"]:
+        stats["handshakeCpu"] += handshakeCpu
+        stats["messageCpu"] += messageCpu
+
+
+def _acceptLoop(server, p, q, keyPool, options, stats, threads):
+    '''
+    Aceita conexões até o socket do servidor ser fechado, criando uma thread por sessão.
+    '''
+    while True:
+        try:
+            client_sock, _ = server.accept()
+        except OSError:
+            return
+        thread = threading.Thread(target=_handleSession,
+                                  args=(client_sock, p, q, keyPool, options, stats), daemon=True)
+        threads.append(thread)
+        thread.start()
+
+
+def _message(size):
+    '''
+    Gera uma mensagem de texto de "size" bytes (incluindo a quebra de linha final).
+    '''
+    sentence = b"Mensagem de teste de carga enviada pelo emissor simulado. "
+    size = max(size, 1)
+    return (sentence * (size // len(sentence) + 1))[:size - 1] + b"\n"
+
+
+def _openSession(address, options):
+    '''
+    Abre uma sessão com o receptor: handshake Diffie-Hellman e negociação da compressão.
+
+    Saída:
+    - Tupla (socket, EncryptedStream) pronta para a troca de mensagens
+    '''
+    client = socket.create_connection(address)
+    try:
+        p = int(recvLine(client))
+        q = int(recvLine(client))
+        # Como no sender.py, o par é gerado na hora: p e q só são conhecidos no handshake
+        privateClient, publicClient = keyGeneration(p, q)
+        publicServer = int(recvLine(client))
+        sendLine(client, publicClient)
+        DES_key = _desKey(p, q, sharedKeyGeneration(publicServer, privateClient, p))
+        compression = proposeCompression(client, options["compression"])
+        return client, EncryptedStream(client, DES_key, chunkSize=options["chunkSize"],
+                                       compression=compression,
+                                       compressionThreshold=options["compressionThreshold"])
+    except BaseException:
+        client.close()
+        raise
+
+
+def _driveSession(stream, messages, options, latencies, sentBytes, index):
+    '''
+    Envia as mensagens de uma sessão no ritmo configurado e mede a latência de cada confirmação.
+    Executada em uma thread própria, para que as sessões de um emissor fiquem ativas ao mesmo tempo.
+    '''
+    sessionStart = time.perf_counter()
+    for number in range(options["messages"]):
+        if options["rate"] > 0:
+            # Aguarda o instante programado da mensagem para manter a taxa configurada
+            delay = sessionStart + number / options["rate"] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        message = messages[number % len(messages)]
+        sendStart = time.perf_counter()
+        stream.sendall(message)
+        if stream.recv(1) != b"\n":
+            raise ConnectionError("Confirmação inválida do receptor")
+        latencies.append(time.perf_counter() - sendStart)
+        sentBytes[index] += len(message)
+
+
+def _runSender(address, options, barrier):
+    '''
+    Emissor simulado (executado em um processo separado). Todos os emissores aguardam na
+    barreira antes de cada fase, de modo que a fase de handshakes (abrir todas as sessões)
+    e a fase de mensagens são medidas separadamente e sem o custo de iniciar os processos.
+    Na fase de mensagens cada sessão é conduzida por uma thread própria.
+
+    Saída:
+    - Dicionário com os tempos de handshake, as latências, o início/fim de cada fase
+      (time.monotonic, comparável entre processos) e o tempo de CPU de cada fase
+    '''
+    messages = [_message(size) for size in options["sizes"]]
+    handshakeTimes = []
+    latencies = []
+    sessions = []
+    sentBytes = [0] * options["sessions"]
+    errors = []
+
+    def drive(stream, index):
+        try:
+            _driveSession(stream, messages, options, latencies, sentBytes, index)
+        except BaseException as error:
+            errors.append(error)
+
+    try:
+        barrier.wait()
+        handshakeStart = time.monotonic()
+        cpuStart = time.process_time()
+        for _ in range(options["sessions"]):
+            start = time.perf_counter()
+            sessions.append(_openSession(address, options))
+            handshakeTimes.append(time.perf_counter() - start)
+        handshakeEnd = time.monotonic()
+        handshakeCpu = time.process_time() - cpuStart
+
+        barrier.wait()
+        messageStart = time.monotonic()
+        cpuStart = time.process_time()
+        threads = [threading.Thread(target=drive, args=(stream, index))
+                   for index, (_, stream) in enumerate(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        messageEnd = time.monotonic()
+        messageCpu = time.process_time() - cpuStart
+    except BaseException:
+        barrier.abort()  # Libera os demais emissores em vez de deixá-los esperando
+        raise
+    finally:
+        for client, _ in sessions:
+            client.close()
+
+    return {
+        "handshakeTimes": handshakeTimes,
+        "latencies": latencies,
+        "bytes": sum(sentBytes),
+        "handshakeStart": handshakeStart,
+        "handshakeEnd": handshakeEnd,
+        "messageStart": messageStart,
+        "messageEnd": messageEnd,
+        "handshakeCpu": handshakeCpu,
+        "messageCpu": messageCpu,
+    }
+
+
+def _percentile(values, fraction):
+    '''
+    Percentil pelo método do posto mais próximo; "values" deve estar ordenado.
+    '''
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+    return values[index]
+
+
+def runLoadTest(senders=4, sessions=1, messages=100, sizes=(64, 1024, 4096), rate=0,
+                compression="none", compressionThreshold=256, chunkSize=4096, keyPool=True):
+    '''
+    Executa o teste de carga completo em loopback e retorna um dicionário com os resultados.
+
+    Entrada:
+    - senders: Quantidade de emissores simulados concorrentes (um processo cada)
+    - sessions: Sessões (handshakes) abertas em sequência por emissor; na fase de mensagens
+      todas ficam ativas ao mesmo tempo, cada uma em uma thread
+    - messages: Mensagens enviadas por sessão
+    - sizes: Tamanhos das mensagens em bytes, usados em ciclo
+    - rate: Mensagens por segundo por sessão (0 envia o mais rápido possível)
+    - compression: "none", "zlib" ou "lzma"
+    - compressionThreshold: Tamanho mínimo de um quadro para ser comprimido
+    - chunkSize: Tamanho máximo do texto claro de cada quadro do EncryptedStream
+    - keyPool: Se verdadeiro, os pares de chaves do receptor vêm do pool de chaves efêmeras
+      (os emissores sempre geram o par na hora, como o sender.py)
+    '''
+    for name, value in (("senders", senders), ("sessions", sessions), ("messages", messages)):
+        if value < 1:
+            raise ValueError(f"{name} deve ser pelo menos 1")
+
+    options = {
+        "senders": senders, "sessions": sessions, "messages": messages,
+        "sizes": list(sizes), "rate": rate,
+        "compression": compression, "compressionThreshold": compressionThreshold,
+        "chunkSize": chunkSize, "keyPool": keyPool,
+    }
+
+    # Parâmetros globais escolhidos uma única vez, como no receiver.py
+    p = getLargePrimeNumber(1000, 2000)
+    q = getPrimitiveRoot(p, True)
+    receiverPool = getKeyPool(p, q) if keyPool else None
+
+    stats = {"lock": threading.Lock(), "handshakeCpu": 0.0, "messageCpu": 0.0}
+    threads = []
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))  # Porta livre escolhida pelo sistema
+    server.listen(senders * sessions)
+    threading.Thread(target=_acceptLoop,
+                     args=(server, p, q, receiverPool, options, stats, threads),
+                     daemon=True).start()
+
+    start = time.perf_counter()
+    # "spawn" evita que os emissores herdem o pool de chaves do receptor (e suas chaves) via fork
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager, \
+            ProcessPoolExecutor(max_workers=senders, mp_context=context) as executor:
+        # A barreira só é liberada quando todos os processos já iniciaram
+        barrier = manager.Barrier(senders, timeout=120)
+        futures = [executor.submit(_runSender, server.getsockname(), options, barrier)
+                   for _ in range(senders)]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    server.close()
+    # Aguarda o receptor terminar de processar as sessões encerradas pelos emissores
+    for thread in threads:
+        thread.join(timeout=30)
+
+    handshakeTimes = sorted(t for result in results for t in result["handshakeTimes"])
+    latencies = sorted(t for result in results for t in result["latencies"])
+    totalHandshakes = len(handshakeTimes)
+    totalMessages = len(latencies)
+    handshakeDuration = (max(result["handshakeEnd"] for result in results)
+                         - min(result["handshakeStart"] for result in results))
+    messageDuration = (max(result["messageEnd"] for result in results)
+                       - min(result["messageStart"] for result in results))
+
+    return {
+        "options": options,
+        "duration": elapsed,
+        "handshakes": totalHandshakes,
+        "handshakeDuration": handshakeDuration,
+        "handshakesPerSecond": totalHandshakes / handshakeDuration,
+        "handshakeLatency": {name: _percentile(handshakeTimes, fraction)
+                             for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))},
+        "receiverCpuPerHandshake": stats["handshakeCpu"] / totalHandshakes,
+        "senderCpuPerHandshake": sum(result["handshakeCpu"] for result in results) / totalHandshakes,
+        "messages": totalMessages,
+        "messageDuration": messageDuration,
+        "messagesPerSecond": totalMessages / messageDuration,
+        "bytesPerSecond": sum(result["bytes"] for result in results) / messageDuration,
+        "latency": {name: _percentile(latencies, fraction)
+                    for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))},
+        "receiverCpuPerMessage": stats["messageCpu"] / totalMessages,
+        "senderCpuPerMessage": sum(result["messageCpu"] for result in results) / totalMessages,
+        "receiverKeyPool": receiverPool.metrics() if receiverPool is not None else None,
+    }
+
+
+def printReport(report):
+    '''
+    Exibe o resultado do teste de carga em formato legível.
+    '''
+    options = report["options"]
+    print(f"Emissores: {options['senders']}, "
+          f"compressão: {options['compression']}, pool de chaves do receptor: {options['keyPool']}, "
+          f"quadro: {options['chunkSize']} bytes")
+    print(f"Duração total (incluindo o início dos processos): {report['duration']:.2f} s")
+    print(f"Handshakes: {report['handshakes']} em {report['handshakeDuration']:.2f} s "
+          f"({report['handshakesPerSecond']:.1f}/s)")
+    print("Latência do handshake (ms): " + ", ".join(
+        f"{name}={value * 1000:.2f}" for name, value in report["handshakeLatency"].items()))
+    print(f"CPU por handshake (ms): receptor={report['receiverCpuPerHandshake'] * 1000:.2f}, "
+          f"emissores={report['senderCpuPerHandshake'] * 1000:.2f}")
+    print(f"Mensagens: {report['messages']} em {report['messageDuration']:.2f} s "
+          f"({report['messagesPerSecond']:.1f}/s, {report['bytesPerSecond'] / 1024:.1f} KiB/s)")
+    print("Latência das mensagens (ms): " + ", ".join(
+        f"{name}={value * 1000:.2f}" for name, value in report["latency"].items()))
+    print(f"CPU por mensagem (ms): receptor={report['receiverCpuPerMessage'] * 1000:.2f}, "
+          f"emissores={report['senderCpuPerMessage'] * 1000:.2f}")
+    if report["receiverKeyPool"] is not None:
+        print(f"Pool de chaves do receptor: {report['receiverKeyPool']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Teste de carga em loopback do protocolo Diffie-Hellman + DES")
+    parser.add_argument("--senders", type=int, default=4, help="emissores simulados concorrentes")
+    parser.add_argument("--sessions", type=int, default=1, help="sessões (handshakes) por emissor")
+    parser.add_argument("--messages", type=int, default=100, help="mensagens por sessão")
+    parser.add_argument("--sizes", default="64,1024,4096",
+                        help="tamanhos das mensagens em bytes, separados por vírgula")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="mensagens por segundo por sessão (0 = sem limite)")
+    parser.add_argument("--compression", default="none", choices=("none",) + compressionMethods)
+    parser.add_argument("--compression-threshold", type=int, default=256)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    parser.add_argument("--no-key-pool", action="store_true",
+                        help="o receptor gera os pares de chaves no handshake em vez de usar o pool")
+    parser.add_argument("--json", action="store_true", help="exibe o resultado em JSON")
+    args = parser.parse_args()
+    for name in ("senders", "sessions", "messages"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name} deve ser pelo menos 1")
+
+    report = runLoadTest(senders=args.senders, sessions=args.sessions, messages=args.messages,
+                         sizes=[int(size) for size in args.sizes.split(",")], rate=args.rate,
+                         compression=args.compression,
+                         compressionThreshold=args.compression_threshold,
+                         chunkSize=args.chunk_size, keyPool=not args.no_key_pool)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        printReport(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import lzma  # Compressão LZMA (maior taxa, mais lenta)
+import zlib  # Compressão zlib/DEFLATE (rápida)
+from modules.line_protocol import recvLine, sendLine
+
+'''
+Compressão opcional aplicada antes da criptografia com o DES
+
+Lógica da compressão:
+1. O método é negociado após o Diffie-Hellman: o emissor propõe e o receptor aceita ou recusa ("none").
+2. Cada quadro do fluxo criptografado é comprimido antes de passar pelo DES, reduzindo
+   a quantidade de blocos de 64 bits a criptografar e os bytes enviados.
+3. Quadros menores que o limiar (threshold) não são comprimidos, pois o ganho não compensa.
+4. No zlib, o compressor é único por sessão (streaming), reaproveitando o histórico entre quadros;
+   cada quadro termina com um "sync flush" para poder ser descomprimido assim que chega.
+5. O LZMA não permite "sync flush", então cada quadro é comprimido de forma independente.
+'''
+
+compressionMethods = ("zlib", "lzma")  # Métodos suportados, além de "none"
+
+_lzmaFilters = [{"id": lzma.FILTER_LZMA2, "preset": 6}]  # Formato bruto, sem cabeçalho por quadro
+
+
+class StreamCompressor():
+
+    def __init__(self, method, threshold=256):
+        '''
+        Inicializa o compressor da sessão.
+
+        Entrada:
+        - method: "zlib" ou "lzma"
+        - threshold: Quadros com menos bytes que este valor são enviados sem compressão
+        '''
+        if method not in compressionMethods:
+            raise ValueError(f"Método de compressão não suportado: {method}")
+        self.method = method
+        self.threshold = threshold
+        self.compressor = zlib.compressobj() if method == "zlib" else None
+        self.rawBytes = 0  # Bytes de texto claro recebidos
+        self.compressedBytes = 0  # Bytes produzidos (comprimidos ou não)
+
+    def compress(self, chunk):
+        '''
+        Comprime um quadro de texto claro.
+
+        Saída:
+        - Tupla (comprimido, dados): "comprimido" indica se os dados passaram pela compressão
+        '''
+        chunk = bytes(chunk)
+        self.rawBytes += len(chunk)
+        if len(chunk) < self.threshold:
+            self.compressedBytes += len(chunk)
+            return False, chunk
+
+        if self.compressor is not None:
+            data = self.compressor.compress(chunk) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            data = lzma.compress(chunk, format=lzma.FORMAT_RAW, filters=_lzmaFilters)
+        self.compressedBytes += len(data)
+        return True, data
+
+
+class StreamDecompressor():
+
+    def __init__(self, method, maxLength):
+        '''
+        Inicializa o descompressor da sessão, correspondente ao StreamCompressor do outro lado.
+
+        Entrada:
+        - method: "zlib" ou "lzma"
+        - maxLength: Tamanho máximo do texto claro de um quadro (o chunkSize do emissor)
+        '''
+        if method not in compressionMethods:
+            raise ValueError(f"Método de compressão não suportado: {method}")
+        self.method = method
+        self.maxLength = maxLength
+        self.decompressor = zlib.decompressobj() if method == "zlib" else None
+
+    def decompress(self, data):
+        '''
+        Descomprime um quadro produzido por StreamCompressor.compress.
+
+        Um emissor honesto nunca coloca mais que maxLength bytes de texto claro em um quadro,
+        então a saída é limitada a esse tamanho e o quadro é rejeitado (ValueError) se ainda
+        restarem dados, evitando "bombas de descompressão".
+        '''
+        if self.decompressor is not None:
+            result = self.decompressor.decompress(data, self.maxLength)
+            # O que sobrar da entrada só pode ser o marcador do "sync flush", sem novos dados
+            while self.decompressor.unconsumed_tail:
+                if self.decompressor.decompress(self.decompressor.unconsumed_tail, 1):
+                    raise ValueError("Quadro comprimido excede o tamanho máximo")
+            return result
+
+        decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=_lzmaFilters)
+        result = decompressor.decompress(data, self.maxLength)
+        if not decompressor.eof and not decompressor.needs_input and decompressor.decompress(b"", 1):
+            raise ValueError("Quadro comprimido excede o tamanho máximo")
+        if not decompressor.eof:
+            raise ValueError("Quadro comprimido incompleto")
+        return result
+
+
+def proposeCompression(sock, method):
+    '''
+    Lado do emissor: propõe um método de compressão e retorna o método aceito pelo receptor.
+    '''
+    sendLine(sock, method)
+    return recvLine(sock)
+
+
+def acceptCompression(sock, supported=compressionMethods):
+    '''
+    Lado do receptor: recebe a proposta do emissor e responde com o método aceito
+    ("none" se a proposta não estiver entre os métodos suportados).
+    '''
+    proposal = recvLine(sock)
+    method = proposal if proposal in supported else "none"
+    sendLine(sock, method)
+    return method
+
+
+if __name__ == '__main__':
+    import time
+    from modules.des import DES_Algorithm
+
+    # Mede o custo do DES por mensagem com e sem compressão, para mensagens de texto típicas
+    sentence = "Mensagem de texto enviada entre o emissor e o receptor pelo canal criptografado. "
+    key = "key_master"
+    cipher = DES_Algorithm(text="", key=key, encrypt=True)
+    cipher.keyGeneration()  # Gera as subchaves fora da medição
+
+    def bestTime(function, repeat=7):
+        # Menor tempo entre algumas execuções, para reduzir o ruído da medição
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    def encryptTime(data):
+        cipher.text = data.decode("latin-1")
+        return bestTime(cipher.DES)[0]
+
+    print(f"{'método':<6} {'bytes':>6} {'comprimido':>10} {'DES (ms)':>9} {'total (ms)':>10} {'economia':>8}")
+    for size in (128, 1024, 4096):
+        message = (sentence * (size // len(sentence) + 1)).encode()[:size]
+        baseline = encryptTime(message)
+        for method in compressionMethods:
+            # Compressor novo a cada execução: mede uma mensagem isolada, sem histórico do zlib
+            compressTime, (compressed, data) = bestTime(
+                lambda: StreamCompressor(method).compress(message))
+            if not compressed:
+                # Abaixo do limiar a mensagem segue sem compressão: o custo é o próprio DES
+                print(f"{method:<6} {size:>6} {'-':>10} {baseline * 1000:>9.2f} "
+                      f"{baseline * 1000:>10.2f} abaixo do limiar")
+                continue
+            total = compressTime + encryptTime(data)
+            print(f"{method:<6} {size:>6} {len(data):>10} {baseline * 1000:>9.2f} "
+                  f"{total * 1000:>10.2f} {1 - total / baseline:>8.0%}")
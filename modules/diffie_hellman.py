@@ -1,4 +1,7 @@
+import os  # Número de núcleos, usado como padrão de fatias com um executor
 import random  # Importa a biblioteca para geração de números aleatórios
+from array import array  # Arrays compactos para as operações em lote
+from concurrent.futures import ProcessPoolExecutor  # Distribui lotes entre processos
 
 '''
 Parâmetros globais usados no Diffie-Hellman:
@@ -118,6 +121,152 @@ def sharedKeyGeneration(publicKey, privateKey, number):
     return (publicKey ** privateKey) % number
 
 
+def _checkBatchModulus(number, privateKeyLimit=0):
+    '''
+    Garante que os valores do lote cabem em inteiros sem sinal de 64 bits,
+    formato usado pelos arrays compactos retornados pelas funções em lote.
+    '''
+    if number >= 2 ** 64 or privateKeyLimit >= 2 ** 64:
+        raise ValueError("As operações em lote suportam apenas valores de até 64 bits")
+
+
+def _splitBatch(count, processes):
+    '''
+    Divide "count" itens em fatias contíguas, uma por processo.
+
+    Saída:
+    - Lista de tuplas (início, fim) cobrindo o intervalo [0, count)
+    '''
+    processes = max(1, min(processes, count))
+    size, extra = divmod(count, processes)
+    bounds = []
+    start = 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _keyGenerationChunk(number, root, count, privateKeyLimit):
+    '''
+    Gera "count" pares de chaves em um único processo e retorna os arrays compactos.
+    '''
+    privateKeys = array('Q')
+    publicKeys = array('Q')
+    for _ in range(count):
+        private = random.randint(privateKeyLimit - 100, privateKeyLimit)
+        privateKeys.append(private)
+        # pow com módulo evita calcular a potência completa antes do resto
+        publicKeys.append(pow(root, private, number))
+    return privateKeys, publicKeys
+
+
+def _sharedKeyGenerationChunk(publicKeys, privateKeys, number):
+    '''
+    Calcula as chaves compartilhadas de um trecho do lote em um único processo.
+    '''
+    return array('Q', (pow(public, private, number)
+                       for public, private in zip(publicKeys, privateKeys)))
+
+
+def _submitBatch(executor, processes, submitChunk, count):
+    '''
+    Divide o lote em fatias e as executa no executor fornecido ou, se não houver,
+    em um ProcessPoolExecutor temporário com "processes" processos.
+
+    Saída:
+    - Lista com os resultados de cada fatia, na ordem do lote
+    '''
+    if executor is not None:
+        bounds = _splitBatch(count, processes or os.cpu_count() or 1)
+        futures = [submitChunk(executor, start, end) for start, end in bounds]
+        return [future.result() for future in futures]
+
+    bounds = _splitBatch(count, processes)
+    with ProcessPoolExecutor(max_workers=len(bounds)) as ownExecutor:
+        futures = [submitChunk(ownExecutor, start, end) for start, end in bounds]
+        return [future.result() for future in futures]
+
+
+def batchKeyGeneration(number, root, count, privateKeyLimit=101, processes=None, executor=None):
+    '''
+    Versão em lote de keyGeneration: gera "count" pares de chaves de uma só vez,
+    útil para pré-gerar chaves efêmeras ou para testes de carga.
+
+    Com os módulos de até 64 bits suportados, cada par custa cerca de 1 µs, enquanto criar
+    um pool de processos custa dezenas de milissegundos. Por isso o padrão é executar no
+    processo atual; a execução paralela só pode compensar com um executor criado uma vez
+    pelo chamador e reaproveitado, em máquinas com vários núcleos e lotes grandes
+    (centenas de milhares de pares). Meça antes de usar.
+
+    Entrada:
+    - number: O número primo grande (q)
+    - root: A raiz primitiva de q
+    - count: Quantidade de pares de chaves a gerar
+    - privateKeyLimit: Limite superior opcional para o valor da chave privada
+    - processes: Número de fatias/processos; None ou 1 executa no processo atual
+      (se "executor" for informado, o padrão é o número de núcleos, os.cpu_count())
+    - executor: ProcessPoolExecutor do chamador, reaproveitado entre chamadas
+
+    Saída:
+    - Tupla (chaves privadas, chaves públicas), cada uma um array('Q') com "count" valores,
+      onde o índice i das duas listas forma um par
+    '''
+    privateKeyLimit = max(privateKeyLimit, 101)
+    _checkBatchModulus(number, privateKeyLimit)
+    if count <= 0:
+        return array('Q'), array('Q')
+
+    if executor is None and (not processes or processes <= 1):
+        return _keyGenerationChunk(number, root, count, privateKeyLimit)
+
+    def submitChunk(pool, start, end):
+        return pool.submit(_keyGenerationChunk, number, root, end - start, privateKeyLimit)
+
+    privateKeys = array('Q')
+    publicKeys = array('Q')
+    for chunkPrivate, chunkPublic in _submitBatch(executor, processes, submitChunk, count):
+        privateKeys.extend(chunkPrivate)
+        publicKeys.extend(chunkPublic)
+    return privateKeys, publicKeys
+
+
+def batchSharedKeyGeneration(publicKeys, privateKeys, number, processes=None, executor=None):
+    '''
+    Versão em lote de sharedKeyGeneration: calcula várias chaves compartilhadas de uma vez.
+    Assim como em batchKeyGeneration, a execução paralela só compensa com um executor
+    reaproveitado e lotes grandes.
+
+    Entrada:
+    - publicKeys: Sequência com as chaves públicas das outras partes
+    - privateKeys: Sequência com as chaves privadas correspondentes (mesmo tamanho)
+    - number: O número primo grande (q)
+    - processes: Número de fatias/processos; None ou 1 executa no processo atual
+      (se "executor" for informado, o padrão é o número de núcleos, os.cpu_count())
+    - executor: ProcessPoolExecutor do chamador, reaproveitado entre chamadas
+
+    Saída:
+    - Um array('Q') onde o índice i é (publicKeys[i] ^ privateKeys[i]) % number
+    '''
+    if len(publicKeys) != len(privateKeys):
+        raise ValueError("As listas de chaves públicas e privadas devem ter o mesmo tamanho")
+    _checkBatchModulus(number)
+
+    if len(publicKeys) <= 1 or (executor is None and (not processes or processes <= 1)):
+        return _sharedKeyGenerationChunk(publicKeys, privateKeys, number)
+
+    def submitChunk(pool, start, end):
+        # Envia cada fatia como array para reduzir o custo de serialização entre processos
+        return pool.submit(_sharedKeyGenerationChunk, array('Q', publicKeys[start:end]),
+                           array('Q', privateKeys[start:end]), number)
+
+    result = array('Q')
+    for chunk in _submitBatch(executor, processes, submitChunk, len(publicKeys)):
+        result.extend(chunk)
+    return result
+
+
 def isPrime(number):
     '''
     Verifica se um número é primo. A segurança do Diffie-Hellman
@@ -169,3 +318,13 @@ if __name__ == '__main__':
     # Verifica se ambas as chaves compartilhadas são iguais
     assert a_shared_key == b_shared_key, "Erro: As chaves compartilhadas não correspondem!"
     print("Chaves compartilhadas coincidem! A troca de chaves foi bem-sucedida.")
+
+    # Geração em lote: vários pares de chaves e chaves compartilhadas de uma só vez
+    # (o executor é criado uma vez e reaproveitado, pois iniciar processos custa mais que o lote)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        privatesA, publicsA = batchKeyGeneration(q, a, 1000, executor=executor)
+        privatesB, publicsB = batchKeyGeneration(q, a, 1000)
+        sharedA = batchSharedKeyGeneration(publicsB, privatesA, q, executor=executor)
+        sharedB = batchSharedKeyGeneration(publicsA, privatesB, q)
+    assert sharedA == sharedB, "Erro: As chaves compartilhadas em lote não correspondem!"
+    print(f"{len(sharedA)} chaves compartilhadas geradas em lote com sucesso.")
@@ -0,0 +1,228 @@
+import io  # Adaptadores de arquivo para o makefile
+import lzma  # Erros da descompressão LZMA
+import zlib  # Erros da descompressão zlib
+import struct  # Cabeçalho binário de cada quadro
+from modules.des import DES_Algorithm
+from modules.compression import StreamCompressor, StreamDecompressor
+
+'''
+Fluxo criptografado sobre um socket usando o DES
+
+Formato de cada quadro enviado pelo socket:
+1. Cabeçalho de 5 bytes (big-endian): 1 byte indicando se o trecho foi comprimido
+   e 4 bytes com o tamanho do trecho antes da criptografia,
+2. O trecho criptografado com o DES, completado até um múltiplo de 8 bytes.
+
+Os dados são divididos em trechos de tamanho fixo (chunkSize), de modo que
+transferências de qualquer tamanho usam memória constante nos dois lados.
+O padding de espaços do DES é descartado na leitura graças ao tamanho do cabeçalho.
+'''
+
+frameHeader = struct.Struct(">BI")
+
+recvStep = 65536  # Quantidade máxima de bytes lidos do socket por chamada
+
+
+class EncryptedStream():
+
+    def __init__(self, sock, key, chunkSize=4096, compression="none", compressionThreshold=256):
+        '''
+        Envolve um socket já conectado. Ambos os lados devem usar a mesma chave do DES
+        e o mesmo método de compressão (ver modules.compression).
+
+        Entrada:
+        - sock: Socket conectado
+        - key: Chave do DES (pelo menos 8 caracteres)
+        - chunkSize: Tamanho máximo, em bytes, do texto claro de cada quadro
+        - compression: "none", "zlib" ou "lzma"; a compressão é aplicada antes do DES
+        - compressionThreshold: Quadros menores que este valor não são comprimidos
+        '''
+        self.sock = sock
+        self.chunkSize = max(chunkSize, 8)
+        # Tamanho máximo aceito para um quadro recebido; com compressão, dados incompressíveis
+        # podem crescer um pouco, então é dada uma pequena folga
+        self.maxFrameSize = self.chunkSize
+        if compression != "none":
+            self.maxFrameSize += self.chunkSize // 1000 + 64
+        # As subchaves são geradas uma única vez e reaproveitadas em todos os quadros
+        self.encrypter = DES_Algorithm(text="", key=key, encrypt=True)
+        self.decrypter = DES_Algorithm(text="", key=key, encrypt=False)
+        if compression != "none":
+            self.compressor = StreamCompressor(compression, compressionThreshold)
+            self.decompressor = StreamDecompressor(compression, self.chunkSize)
+        else:
+            self.compressor = None
+            self.decompressor = None
+        self.pending = memoryview(b"")  # Texto claro recebido ainda não entregue
+        self.lastCiphertext = b""  # Último quadro criptografado recebido (para exibição)
+
+    def _encrypt(self, chunk):
+        '''
+        Criptografa um trecho de bytes. Cada byte é tratado como um caractere de 8 bits.
+        '''
+        self.encrypter.text = bytes(chunk).decode("latin-1")
+        return self.encrypter.DES().encode("latin-1")
+
+    def _decrypt(self, chunk):
+        '''
+        Descriptografa um trecho de bytes (tamanho múltiplo de 8).
+        '''
+        self.decrypter.text = bytes(chunk).decode("latin-1")
+        return self.decrypter.DES().encode("latin-1")
+
+    def sendall(self, data):
+        '''
+        Criptografa e envia todos os bytes de "data", quadro a quadro.
+        '''
+        view = memoryview(data).cast("B")
+        for start in range(0, len(view), self.chunkSize):
+            chunk = view[start:start + self.chunkSize]
+            compressed = False
+            if self.compressor is not None:
+                compressed, chunk = self.compressor.compress(chunk)
+            self.sock.sendall(frameHeader.pack(compressed, len(chunk)) + self._encrypt(chunk))
+
+    def _recvExactly(self, size):
+        '''
+        Lê exatamente "size" bytes do socket.
+
+        Saída:
+        - Os bytes lidos, ou None se a conexão foi encerrada antes do primeiro byte
+        '''
+        buffer = bytearray()
+        while len(buffer) < size:
+            # Lê em passos limitados, sem reservar o tamanho inteiro antes dos dados chegarem
+            data = self.sock.recv(min(size - len(buffer), recvStep))
+            if not data:
+                if not buffer:
+                    return None
+                raise ConnectionError("Conexão encerrada no meio de um quadro")
+            buffer += data
+        return buffer
+
+    def _readFrame(self):
+        '''
+        Lê e descriptografa o próximo quadro, guardando o texto claro em "pending".
+
+        Saída:
+        - False se a conexão foi encerrada, True caso contrário
+        '''
+        header = self._recvExactly(frameHeader.size)
+        if header is None:
+            return False
+        compressed, length = frameHeader.unpack(header)
+        if length > self.maxFrameSize:
+            raise ConnectionError(f"Quadro de {length} bytes excede o limite de {self.maxFrameSize} bytes")
+        # O texto criptografado ocupa o tamanho do trecho arredondado para múltiplo de 8
+        ciphertext = self._recvExactly(-(-length // 8) * 8) if length else b""
+        if ciphertext is None:
+            raise ConnectionError("Conexão encerrada no meio de um quadro")
+        self.lastCiphertext = bytes(ciphertext)
+        plaintext = self._decrypt(ciphertext)[:length]
+        if compressed:
+            if self.decompressor is None:
+                raise ConnectionError("Quadro comprimido recebido sem compressão negociada")
+            try:
+                plaintext = self.decompressor.decompress(plaintext)
+            except (ValueError, zlib.error, lzma.LZMAError) as error:
+                raise ConnectionError(f"Quadro comprimido inválido: {error}") from error
+        self.pending = memoryview(plaintext)
+        return True
+
+    def recv_into(self, buffer, nbytes=0):
+        '''
+        Recebe até "nbytes" bytes descriptografados (ou len(buffer), se nbytes for 0) em "buffer".
+
+        Saída:
+        - Quantidade de bytes escritos; 0 indica que a conexão foi encerrada
+        '''
+        target = memoryview(buffer).cast("B")
+        size = min(nbytes, len(target)) if nbytes else len(target)
+        if size == 0:
+            return 0
+        while not self.pending:
+            if not self._readFrame():
+                return 0
+        count = min(size, len(self.pending))
+        target[:count] = self.pending[:count]
+        self.pending = self.pending[count:]
+        return count
+
+    def recv(self, bufsize):
+        '''
+        Recebe até "bufsize" bytes descriptografados; retorna b"" quando a conexão é encerrada.
+        '''
+        buffer = bytearray(bufsize)
+        count = self.recv_into(buffer)
+        return bytes(buffer[:count])
+
+    def makefile(self, mode="rb", buffering=io.DEFAULT_BUFFER_SIZE):
+        '''
+        Retorna um objeto de arquivo binário sobre o fluxo criptografado,
+        permitindo usar readline, shutil.copyfileobj etc.
+
+        Entrada:
+        - mode: "rb", "wb" ou "rwb"
+        - buffering: Tamanho do buffer do objeto de arquivo
+        '''
+        raw = _EncryptedStreamIO(self, mode)
+        if raw.readable() and raw.writable():
+            return io.BufferedRWPair(raw, raw, buffering)
+        if raw.readable():
+            return io.BufferedReader(raw, buffering)
+        return io.BufferedWriter(raw, buffering)
+
+    def close(self):
+        '''
+        Fecha o socket subjacente.
+        '''
+        self.sock.close()
+
+
+class _EncryptedStreamIO(io.RawIOBase):
+    '''
+    Adaptador de E/S bruta usado pelo makefile do EncryptedStream.
+    '''
+
+    def __init__(self, stream, mode):
+        super().__init__()
+        if not set(mode) <= set("rwb") or not set(mode) & set("rw"):
+            raise ValueError(f"Modo inválido: {mode!r}")
+        self.stream = stream
+        self.mode = mode
+
+    def readable(self):
+        return "r" in self.mode
+
+    def writable(self):
+        return "w" in self.mode
+
+    def readinto(self, buffer):
+        return self.stream.recv_into(buffer)
+
+    def write(self, data):
+        self.stream.sendall(data)
+        return len(memoryview(data).cast("B"))
+
+
+if __name__ == '__main__':
+    import socket
+    import threading
+
+    left, right = socket.socketpair()
+    writer = EncryptedStream(left, "key_master", chunkSize=64, compression="zlib", compressionThreshold=32)
+    reader = EncryptedStream(right, "key_master", chunkSize=64, compression="zlib", compressionThreshold=32)
+
+    payload = bytes(range(256)) * 4 + "Mensagem com acentuação\n".encode() * 20
+
+    def send():
+        writer.sendall(payload)
+        left.shutdown(socket.SHUT_WR)
+
+    thread = threading.Thread(target=send)
+    thread.start()
+    received = reader.makefile("rb").read()
+    thread.join()
+
+    assert received == payload, "Erro: Os dados recebidos não correspondem aos enviados!"
+    print(f"{len(received)} bytes transferidos em quadros criptografados de até 64 bytes.")
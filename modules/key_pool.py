@@ -0,0 +1,193 @@
+import threading  # Thread de reabastecimento em segundo plano
+import time  # Medição da taxa de reabastecimento
+from collections import deque  # Fila dos pares de chaves pré-gerados
+from modules.diffie_hellman import keyGeneration, batchKeyGeneration
+
+'''
+Pool de chaves efêmeras do Diffie-Hellman
+
+Lógica do pool:
+1. Para cada conjunto de parâmetros (q, a) é mantida uma fila limitada de pares de chaves já gerados.
+2. Uma thread em segundo plano reabastece a fila sempre que ela fica abaixo da marca mínima (low-water mark).
+3. O handshake apenas retira um par da fila, restando no caminho crítico somente o cálculo da chave compartilhada.
+4. Se a fila estiver vazia, o par é gerado na hora, como antes.
+'''
+
+
+class EphemeralKeyPool():
+
+    def __init__(self, number, root, capacity=64, lowWaterMark=16, privateKeyLimit=101, batchSize=16):
+        '''
+        Inicializa o pool para os parâmetros globais fornecidos.
+
+        Entrada:
+        - number: O número primo grande (q)
+        - root: A raiz primitiva de q
+        - capacity: Quantidade máxima de pares mantidos na fila
+        - lowWaterMark: Quando a fila tem menos pares que este valor, o reabastecimento é iniciado
+        - privateKeyLimit: Limite superior para o valor da chave privada (ver keyGeneration)
+        - batchSize: Quantidade de pares gerados por vez pela thread de reabastecimento
+        '''
+        self.number = number
+        self.root = root
+        self.capacity = max(capacity, 1)
+        self.lowWaterMark = min(max(lowWaterMark, 0), self.capacity)
+        self.privateKeyLimit = privateKeyLimit
+        self.batchSize = max(batchSize, 1)
+
+        self.keys = deque()  # Pares (privada, pública) prontos para uso
+        self.condition = threading.Condition()
+        self.worker = None
+        self.running = False
+
+        # Contadores usados nas métricas
+        self.hits = 0  # Pares entregues a partir da fila
+        self.misses = 0  # Pares gerados na hora por falta de estoque
+        self.generated = 0  # Total de pares gerados pela thread
+        self.refillTime = 0.0  # Tempo total gasto pela thread gerando pares
+        self.startTime = None  # Instante (time.monotonic) em que a thread foi iniciada
+
+    def start(self):
+        '''
+        Inicia a thread de reabastecimento (daemon) e retorna o próprio pool.
+        '''
+        with self.condition:
+            if self.running:
+                return self
+            self.running = True
+            self.startTime = time.monotonic()
+        self.worker = threading.Thread(target=self._refillLoop, daemon=True)
+        self.worker.start()
+        return self
+
+    def stop(self):
+        '''
+        Sinaliza o fim da thread de reabastecimento e aguarda seu término.
+        '''
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+
+    def acquire(self):
+        '''
+        Retira um par de chaves efêmeras do pool. Cada par é entregue uma única vez.
+
+        Saída:
+        - Tupla (chave privada, chave pública), igual ao retorno de keyGeneration
+        '''
+        with self.condition:
+            if self.keys:
+                pair = self.keys.popleft()
+                self.hits += 1
+            else:
+                pair = None
+                self.misses += 1
+            if len(self.keys) < self.lowWaterMark:
+                self.condition.notify()
+
+        if pair is None:
+            # Fila vazia: gera o par no caminho crítico, como no fluxo original
+            return keyGeneration(self.number, self.root, self.privateKeyLimit)
+        return pair
+
+    def metrics(self):
+        '''
+        Retorna um dicionário com a profundidade atual da fila e a taxa de reabastecimento.
+
+        - depth: Pares disponíveis no momento
+        - capacity / lowWaterMark: Configuração do pool
+        - hits / misses: Pares entregues da fila / gerados na hora
+        - generated: Total de pares gerados pela thread
+        - refillRate: Pares adicionados à fila por segundo de relógio desde start()
+        - generationRate: Velocidade de geração da thread (pares por segundo de trabalho)
+        '''
+        with self.condition:
+            uptime = time.monotonic() - self.startTime if self.startTime is not None else 0.0
+            return {
+                "depth": len(self.keys),
+                "capacity": self.capacity,
+                "lowWaterMark": self.lowWaterMark,
+                "hits": self.hits,
+                "misses": self.misses,
+                "generated": self.generated,
+                "refillRate": self.generated / uptime if uptime > 0 else 0.0,
+                "generationRate": self.generated / self.refillTime if self.refillTime > 0 else 0.0,
+            }
+
+    def _refillLoop(self):
+        '''
+        Laço da thread: espera a fila cair abaixo da marca mínima e a completa até a capacidade.
+        '''
+        while True:
+            with self.condition:
+                # Na primeira execução a fila está vazia, o que já dispara o preenchimento
+                while self.running and len(self.keys) >= self.lowWaterMark and self.keys:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                missing = self.capacity - len(self.keys)
+
+            while missing > 0:
+                count = min(missing, self.batchSize)
+                start = time.perf_counter()
+                privateKeys, publicKeys = batchKeyGeneration(
+                    self.number, self.root, count, self.privateKeyLimit)
+                elapsed = time.perf_counter() - start
+
+                with self.condition:
+                    if not self.running:
+                        return
+                    self.keys.extend(zip(privateKeys, publicKeys))
+                    self.generated += count
+                    self.refillTime += elapsed
+                    missing = self.capacity - len(self.keys)
+
+
+_pools = {}  # Pools já criados, indexados pelos parâmetros globais
+_poolsLock = threading.Lock()
+
+
+def getKeyPool(number, root, privateKeyLimit=101, **options):
+    '''
+    Retorna o pool (já iniciado) associado aos parâmetros (q, a), criando-o se necessário.
+    Os demais argumentos nomeados são repassados para EphemeralKeyPool na criação.
+    '''
+    key = (number, root, privateKeyLimit)
+    with _poolsLock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = EphemeralKeyPool(number, root, privateKeyLimit=privateKeyLimit, **options)
+            _pools[key] = pool.start()
+    return pool
+
+
+def keyPoolMetrics():
+    '''
+    Retorna as métricas de todos os pools existentes, indexadas por (q, a, privateKeyLimit).
+    '''
+    with _poolsLock:
+        pools = dict(_pools)
+    return {key: pool.metrics() for key, pool in pools.items()}
+
+
+if __name__ == '__main__':
+    from modules.diffie_hellman import getLargePrimeNumber, getPrimitiveRoot, sharedKeyGeneration
+
+    q = getLargePrimeNumber(1000, 5000)
+    a = getPrimitiveRoot(q)
+    pool = getKeyPool(q, a, capacity=32, lowWaterMark=8)
+    time.sleep(0.1)  # Aguarda o primeiro preenchimento
+    print(f"Métricas após o preenchimento: {pool.metrics()}")
+
+    # Handshake usando pares retirados do pool
+    a_private, a_public = pool.acquire()
+    b_private, b_public = pool.acquire()
+    assert sharedKeyGeneration(b_public, a_private, q) == sharedKeyGeneration(a_public, b_private, q)
+
+    for _ in range(40):
+        pool.acquire()
+    print(f"Métricas após 42 retiradas: {pool.metrics()}")
+    pool.stop()
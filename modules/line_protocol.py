@@ -0,0 +1,39 @@
+'''
+Troca de valores curtos em texto, um por linha, sobre um socket
+
+Usado nas etapas que acontecem antes do fluxo criptografado (parâmetros do Diffie-Hellman,
+chaves públicas e negociação da compressão):
+1. Cada valor é enviado como texto terminado por quebra de linha,
+2. A leitura é feita byte a byte, para não consumir dados que pertencem à etapa seguinte,
+3. Linhas maiores que o limite são rejeitadas, evitando leituras sem fim.
+'''
+
+
+def sendLine(sock, value):
+    '''
+    Envia um valor como texto terminado por quebra de linha.
+    '''
+    sock.sendall(f"{value}\n".encode())
+
+
+def recvLine(sock, limit=64):
+    '''
+    Lê uma linha byte a byte, sem consumir dados além da quebra de linha.
+
+    Entrada:
+    - sock: Socket conectado
+    - limit: Tamanho máximo da linha, sem a quebra de linha
+
+    Saída:
+    - O texto da linha, sem a quebra de linha
+    '''
+    data = bytearray()
+    while True:
+        byte = sock.recv(1)
+        if not byte:
+            raise ConnectionError("Conexão encerrada antes do fim da linha")
+        if byte == b"\n":
+            return data.decode()
+        data += byte
+        if len(data) > limit:
+            raise ConnectionError(f"Linha excede o limite de {limit} bytes")
@@ -1,8 +1,10 @@
 import socket
 import time
 import string
-from modules.diffie_hellman import getLargePrimeNumber, getPrimitiveRoot, keyGeneration, sharedKeyGeneration
-from modules.des import DES_Algorithm
+from modules.diffie_hellman import getLargePrimeNumber, getPrimitiveRoot, sharedKeyGeneration
+from modules.encrypted_stream import EncryptedStream
+from modules.key_pool import getKeyPool
+from modules.compression import acceptCompression, compressionMethods
 
 # Definindo o endereço e porta do servidor
 serverPort = 8001
@@ -43,22 +45,26 @@ def main():
     server.bind((serverIP, serverPort))
     server.listen(1)  # Máximo de 1 conexão aguardando
 
+    # Definindo os parâmetros globais (p e q)
+    p = getLargePrimeNumber(1000, 2000)  # Gerando um número primo grande
+    q = getPrimitiveRoot(p, True)  # Raiz primitiva do número primo
+
+    # Inicia o pool de chaves efêmeras, que é preenchido enquanto aguardamos o cliente
+    keyPool = getKeyPool(p, q)
+
     # Estabelecendo a conexão com o cliente
     print("Aguardando conexão do cliente...")
     client_sock, address = server.accept()  # Aceita a conexão do cliente
     print(client_sock.recv(4096).decode())  # Exibe a mensagem de conexão
 
-    # Definindo os parâmetros globais (p e q)
-    p = getLargePrimeNumber(1000, 2000)  # Gerando um número primo grande
-    q = getPrimitiveRoot(p, True)  # Raiz primitiva do número primo
-
     print("Enviando parâmetros globais para o cliente...\n")
     client_sock.send(str(p).encode())
     time.sleep(2)  # Pausa para garantir sincronização
     client_sock.send(str(q).encode())
 
-    # Gerando o par de chaves pública-privada para o servidor
-    privateServer, publicServer = keyGeneration(p, q)
+    # Retirando do pool o par de chaves pública-privada pré-gerado para o servidor
+    privateServer, publicServer = keyPool.acquire()
+    print(f"Métricas do pool de chaves: {keyPool.metrics()}\n")
     time.sleep(2)
 
     # Enviando a chave pública do servidor para o cliente
@@ -73,23 +79,25 @@ def main():
     key = int(str(sharedKeyGeneration(publicClient, privateServer, p)), 16)
     DES_key = keyGenerationForDES(p, q, key)
     
-    # Loop de recepção de mensagens
-    while True:
-        # Recebe mensagem criptografada
-        actual_message = client_sock.recv(4096).decode()
+    # Negociando a compressão aplicada antes da criptografia
+    compression = acceptCompression(client_sock, compressionMethods)
+    print(f"Compressão negociada: {compression}\n")
+
+    # Fluxo criptografado: as mensagens chegam em quadros de tamanho fixo, uma por linha
+    stream = EncryptedStream(client_sock, DES_key, compression=compression)
+    reader = stream.makefile("rb")
+
+    # Loop de recepção de mensagens (termina quando o cliente encerra a conexão)
+    for line in reader:
         # Descriptografa a mensagem
-        message = DES_Algorithm(text=actual_message,
-                                key=DES_key, encrypt=False).DES()
-
-        # Verifica se a mensagem não é vazia, o que encerraria a comunicação
-        if message != "":
-            # Exibe a mensagem criptografada
-            print(f"Mensagem criptografada recebida transformada em hexadecimal: {actual_message.encode().hex()}")
-            # Exibe a mensagem descriptografada
-            print(f"Mensagem descriptografada: {message}\n")
-        else:
-            client_sock.close()  # Fecha a conexão ao receber a mensagem vazia
-            break
+        message = line.rstrip(b"\n").decode()
+
+        # Exibe o último quadro criptografado recebido (mensagens longas ocupam vários quadros)
+        print(f"Último quadro criptografado recebido transformado em hexadecimal: {stream.lastCiphertext.hex()}")
+        # Exibe a mensagem descriptografada
+        print(f"Mensagem descriptografada: {message}\n")
+
+    stream.close()  # Fecha a conexão após o cliente encerrar a comunicação
 
 
 if __name__ == '__main__':
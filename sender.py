@@ -2,12 +2,17 @@ import socket
 import time
 import string
 from modules.diffie_hellman import keyGeneration, sharedKeyGeneration
-from modules.des import DES_Algorithm
+from modules.encrypted_stream import EncryptedStream
+from modules.compression import proposeCompression
 
 # Definindo o endereço e porta do servidor ao qual vamos nos conectar
 serverPort = 8001
 serverIP = "127.0.0.1"
 
+# Compressão proposta ao servidor ("none" desativa) e tamanho mínimo de um quadro para comprimi-lo
+compressionMethod = "zlib"
+compressionThreshold = 256
+
 # Função para gerar uma chave para o algoritmo DES a partir da chave compartilhada
 
 
@@ -55,6 +60,7 @@ def main():
     print(f"Raiz primitiva: {q}\n")
 
     # Gerando o par de chaves pública-privada para o cliente
+    # (p e q só são conhecidos agora, então um pool de chaves não teria pares prontos)
     privateClient, publicClient = keyGeneration(p, q)
     time.sleep(2)  # Pausa para garantir sincronização
 
@@ -72,22 +78,29 @@ def main():
     
     print("Quando quiser encerrar a comunicação, envie uma mensagem vazia!\n")
 
+    # Negociando a compressão aplicada antes da criptografia
+    compression = proposeCompression(client, compressionMethod)
+    print(f"Compressão negociada: {compression}\n")
+
+    # Fluxo criptografado: as mensagens são enviadas em quadros de tamanho fixo, uma por linha
+    stream = EncryptedStream(client, DES_key, compression=compression,
+                             compressionThreshold=compressionThreshold)
+    writer = stream.makefile("wb")
+
     # Loop de envio de mensagens
     while True:
         message_to_send = input("Digite sua mensagem: ")  # Entrada de mensagem do usuário
         print("\n")
 
-        # Criptografando a mensagem com o DES
-        encryptedMessage = DES_Algorithm(
-            text=message_to_send, key=DES_key, encrypt=True).DES()
-        # Envia a mensagem criptografada
-        client.send(encryptedMessage.encode())
-
         if message_to_send == "":
-            time.sleep(2)
-            client.close()  # Fecha a conexão ao mandar mensagem vazia
+            writer.close()
+            stream.close()  # Fecha a conexão ao mandar mensagem vazia
             break
 
+        # Criptografa e envia a mensagem com o DES, de qualquer tamanho
+        writer.write(message_to_send.encode() + b"\n")
+        writer.flush()
+
 
 if __name__ == '__main__':
     main()